@@ -1,5 +1,7 @@
 # animal_data.py
 
+from functools import lru_cache
+
 ANIMAL_CATEGORIES = {
     "mammals": {
         "name": {"en": "Mammals", "zh": "哺乳动物", "ko": "포유류"},
@@ -759,3 +761,34 @@ def get_animals_by_category(category_id):
 
 def get_animal_detail(animal_id):
     return ANIMALS_DATA.get(animal_id)
+
+@lru_cache(maxsize=None)
+def get_category_columns(category_id, lang):
+    # Parallel per-field tuples for the grid instead of per-card dict lookups
+    animals = get_animals_by_category(category_id)
+    ids = tuple(animals.keys())
+    return (
+        ids,
+        tuple(animals[i]["image"] for i in ids),
+        tuple(animals[i]["name"][lang] for i in ids),
+        tuple(animals[i]["scientific_name"] for i in ids),
+    )
+
+@lru_cache(maxsize=None)
+def get_category_labels(lang):
+    # Selector labels in one pass, plus label -> category id
+    cat_labels, label_to_id = [], {}
+    for cid, cinfo in ANIMAL_CATEGORIES.items():
+        label = f"{cinfo['icon']} {cinfo['name'][lang]}"
+        cat_labels.append(label)
+        label_to_id[label] = cid
+    return tuple(cat_labels), label_to_id
+
+@lru_cache(maxsize=None)
+def get_category_preview(lang):
+    # (label, description, animal count) per category
+    labels, _ = get_category_labels(lang)
+    return tuple(
+        (label, cinfo["description"][lang], len(get_animals_by_category(cid)))
+        for label, (cid, cinfo) in zip(labels, ANIMAL_CATEGORIES.items())
+    )
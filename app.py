@@ -1,10 +1,17 @@
-import os
-import base64
+import hashlib
+import html
+import threading
+import time
 from io import BytesIO
 
+try:
+    # SIMD-accelerated base64; same API as the stdlib module
+    import pybase64 as base64
+except ImportError:
+    import base64
+
 import streamlit as st
 from PIL import Image
-from dotenv import load_dotenv
 from openai import OpenAI
 
 from animal_data import (
@@ -12,68 +19,12 @@ from animal_data import (
     ANIMALS_DATA,
     get_animals_by_category,
     get_animal_detail,
+    get_category_columns,
+    get_category_labels,
+    get_category_preview,
 )
-
-# --------------------------
-# Env
-# --------------------------
-load_dotenv()
-
-DASHSCOPE_API_KEY = os.getenv("DASHSCOPE_API_KEY", "")
-DASHSCOPE_BASE_URL = os.getenv("DASHSCOPE_BASE_URL", "https://dashscope.aliyuncs.com/compatible-mode/v1")
-QWEN_VL_MODEL = os.getenv("QWEN_VL_MODEL", "qwen-vl-plus")
-
-# --------------------------
-# i18n
-# --------------------------
-LANGS = {
-    "English": "en",
-    "中文": "zh",
-    "한국어": "ko",
-}
-
-T = {
-    "app_title": {
-        "en": "Animal ID & Encyclopedia",
-        "zh": "动物识别与百科",
-        "ko": "동물 인식 & 백과",
-    },
-    "nav_home": {"en": "Home", "zh": "首页", "ko": "홈"},
-    "nav_pet": {"en": "Pet Identifier", "zh": "宠物识别", "ko": "반려동물 인식"},
-    "nav_ency": {"en": "Animal Encyclopedia", "zh": "动物百科", "ko": "동물 백과"},
-    "nav_about": {"en": "About", "zh": "关于", "ko": "소개"},
-
-    "home_intro": {
-        "en": "Upload a photo to identify pets and explore animals by category.",
-        "zh": "上传照片识别宠物，按分类探索动物百科。",
-        "ko": "사진을 업로드해 반려동물을 인식하고 분류별 동물을 탐색하세요.",
-    },
-    "pet_upload": {"en": "Upload a pet photo", "zh": "上传宠物照片", "ko": "반려동물 사진 업로드"},
-    "pet_result": {"en": "Identification Result", "zh": "识别结果", "ko": "인식 결과"},
-    "pet_tip": {
-        "en": "Tip: Clear face/body photos work best.",
-        "zh": "提示：宠物正脸或全身清晰照片效果最好。",
-        "ko": "팁: 얼굴/전신이 선명한 사진이 가장 좋아요.",
-    },
-    "no_key_demo": {
-        "en": "No API key found. Running in demo mode (no real AI call).",
-        "zh": "未检测到 API Key，已进入演示模式（不会真实调用AI）。",
-        "ko": "API 키가 없습니다. 데모 모드로 실행됩니다.",
-    },
-    "ency_pick_cat": {"en": "Choose a category", "zh": "选择分类", "ko": "분류 선택"},
-    "ency_animals": {"en": "Animals", "zh": "动物列表", "ko": "동물 목록"},
-    "detail": {"en": "Details", "zh": "详情", "ko": "상세"},
-    "habitat": {"en": "Habitat", "zh": "栖息地", "ko": "서식지"},
-    "facts": {"en": "Fun facts", "zh": "趣味事实", "ko": "재미있는 사실"},
-    "about_text": {
-        "en": "A lightweight Streamlit app for pet identification and animal knowledge.",
-        "zh": "一个轻量级的 Streamlit 宠物识别与动物科普网站。",
-        "ko": "반려동물 인식과 동물 지식을 위한 가벼운 Streamlit 앱입니다.",
-    },
-}
-
-def tr(key, lang):
-    return T.get(key, {}).get(lang, T.get(key, {}).get("en", key))
+from config import cfg
+from i18n import LANGS, PROMPTS, tr
 
 # --------------------------
 # UI helpers
@@ -108,66 +59,108 @@ def inject_css():
         unsafe_allow_html=True,
     )
 
+# Longest side sent to the VL model; it tiles far smaller than phone photos
+MAX_IMAGE_SIDE = 1280
+
+# Decoded formats that can be sent to the API as-is; anything else (BMP, GIF,
+# TIFF, ...) gets mime=None and is re-encoded to JPEG. Phone JPEGs often open
+# as MPO, which is still a valid JPEG stream.
+PASSTHROUGH_MIME = {
+    "JPEG": "image/jpeg",
+    "MPO": "image/jpeg",
+    "PNG": "image/png",
+    "WEBP": "image/webp",
+}
+
 def image_to_data_url(img: Image.Image):
-    # Convert PIL image to base64 data URL
+    # Downscale and convert PIL image to a JPEG base64 data URL
+    # resize() returns a new image, so the caller's image is never mutated
+    scale = MAX_IMAGE_SIDE / max(img.size)
+    if scale < 1:
+        size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+        # reducing_gap does a cheap integer-factor reduce before LANCZOS
+        img = img.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
     buffered = BytesIO()
-    img.save(buffered, format="PNG")
-    b64 = base64.b64encode(buffered.getvalue()).decode()
-    return f"data:image/png;base64,{b64}"
+    img.save(buffered, format="JPEG", quality=85, optimize=False, progressive=False)
+    b64 = base64.b64encode(buffered.getvalue()).decode("ascii")
+    return f"data:image/jpeg;base64,{b64}"
+
+def bytes_to_data_url(raw: bytes, mime: str):
+    # Already-encoded upload bytes can be sent as-is, no decode/re-encode
+    return f"data:{mime};base64,{base64.b64encode(raw).decode('ascii')}"
 
 # --------------------------
 # AI (Pet identification)
 # --------------------------
-def identify_pet_with_qwen(image: Image.Image, lang: str):
+@st.cache_resource
+def get_openai_client(api_key, base_url):
+    # One shared client per (key, url) so reruns reuse its connection pool
+    return OpenAI(api_key=api_key, base_url=base_url)
+
+# Finished replies keyed by (image hash, lang, model). st.cache_data can't hold
+# a live stream, so the text is stored once the stream has completed.
+RESULT_TTL = 3600
+RESULT_MAX_ENTRIES = 256
+
+@st.cache_resource
+def _result_store():
+    # Shared across sessions, so every access goes through the lock
+    return {}, threading.Lock()
+
+def _result_key(image_bytes, lang):
+    digest = hashlib.blake2b(image_bytes, digest_size=16).digest()
+    return digest, lang, cfg().model
+
+def _get_cached_result(key):
+    store, lock = _result_store()
+    with lock:
+        hit = store.get(key)
+    if hit is None or time.monotonic() - hit[0] > RESULT_TTL:
+        return None
+    return hit[1]
+
+def _put_cached_result(key, text):
+    store, lock = _result_store()
+    with lock:
+        store[key] = (time.monotonic(), text)
+        while len(store) > RESULT_MAX_ENTRIES:
+            store.pop(next(iter(store)))
+
+def identify_pet_with_qwen(image_bytes: bytes, mime: str, lang: str, image: Image.Image = None):
     """
     Uses DashScope OpenAI-compatible endpoint.
+    Returns a generator of streamed text chunks on success, or the cached
+    text if the same image was already identified in this language.
     Falls back gracefully if missing key or error.
     """
-    if not DASHSCOPE_API_KEY:
+    config = cfg()
+    if not config.api_key:
         return None, "NO_KEY"
 
-    client = OpenAI(
-        api_key=DASHSCOPE_API_KEY,
-        base_url=DASHSCOPE_BASE_URL,
-    )
+    cache_key = _result_key(image_bytes, lang)
+    cached = _get_cached_result(cache_key)
+    if cached is not None:
+        return cached, None
 
-    data_url = image_to_data_url(image)
-
-    # Prompt in English (model usually handles multilingual output too)
-    # We'll ask the model to respond in the chosen language.
-    prompt = {
-        "en": """You are a pet expert. Identify the pet in the photo.
-Return:
-1) Species/Breed (if confident)
-2) Key visual cues
-3) Likely age stage (baby/adult/senior)
-4) Care tips (3-5 bullets)
-5) Safety note if uncertain
-
-If not a pet, say what the main subject is.""",
-        "zh": """你是宠物专家。请识别照片中的宠物。
-按以下结构输出：
-1）物种/品种（有把握再写）
-2）关键视觉依据
-3）可能年龄阶段（幼年/成年/老年）
-4）饲养与护理建议（3-5条）
-5）不确定性与安全提示
-
-如果不是宠物，请说明主要内容。""",
-        "ko": """당신은 반려동물 전문가입니다. 사진 속 반려동물을 식별하세요.
-다음 구조로 답변:
-1) 종/품종(확신할 때만)
-2) 핵심 시각적 근거
-3) 추정 연령 단계(유/성/노)
-4) 사육·관리 팁(3-5개)
-5) 불확실성 및 안전 안내
-
-반려동물이 아니면 주요 피사체를 설명하세요.""",
-    }[lang]
+    client = get_openai_client(config.api_key, config.base_url)
+
+    prompt = PROMPTS[lang]
 
     try:
-        completion = client.chat.completions.create(
-            model=QWEN_VL_MODEL,
+        # Image.open only reads the header; pixels are decoded only if we
+        # resize, which is also where a truncated/corrupt upload fails
+        if image is None:
+            image = Image.open(BytesIO(image_bytes))
+        if mime and max(image.size) <= MAX_IMAGE_SIDE:
+            data_url = bytes_to_data_url(image_bytes, mime)
+        else:
+            # Decode from a fresh handle so the caller's image never holds pixels
+            data_url = image_to_data_url(Image.open(BytesIO(image_bytes)))
+
+        stream = client.chat.completions.create(
+            model=config.model,
             messages=[
                 {
                     "role": "user",
@@ -177,10 +170,72 @@ If not a pet, say what the main subject is.""",
                     ],
                 }
             ],
+            stream=True,
         )
-        return completion.choices[0].message.content, None
     except Exception as e:
         return f"Error: {e}", "ERROR"
+    return _stream_text(stream, cache_key), None
+
+def _stream_text(stream, cache_key):
+    # Yield text deltas as they arrive; surface mid-stream failures inline
+    parts = []
+    try:
+        for chunk in stream:
+            if chunk.choices:
+                text = chunk.choices[0].delta.content or ""
+                parts.append(text)
+                yield text
+    except Exception as e:
+        yield f"\n\nError: {e}"
+        return
+    text = "".join(parts)
+    # An empty reply would otherwise show as a blank result for the whole TTL
+    if text:
+        _put_cached_result(cache_key, text)
+
+# --------------------------
+# Animal images
+# --------------------------
+def is_remote(src):
+    return src.startswith(("http://", "https://"))
+
+@st.cache_data(show_spinner=False)
+def load_image_bytes(path, width):
+    # Read a local animal image once, pre-resized for its display width.
+    # Returns None on failure so a bad path is cached rather than retried.
+    try:
+        img = Image.open(path).convert("RGB")
+    except OSError:
+        return None
+    # Keep 2x the CSS width so the image stays sharp on HiDPI screens
+    img.thumbnail((width * 2, width * 8), Image.Resampling.LANCZOS)
+    buffered = BytesIO()
+    img.save(buffered, format="JPEG", quality=85)
+    return buffered.getvalue()
+
+# Local grid thumbnails are embedded inline, so keep them small
+GRID_IMAGE_WIDTH = 480
+
+@st.cache_data(show_spinner=False)
+def img_data_url(path, width=GRID_IMAGE_WIDTH):
+    # load_image_bytes re-encodes resized images as JPEG
+    raw = load_image_bytes(path, width)
+    return bytes_to_data_url(raw, "image/jpeg") if raw else None
+
+def grid_image_html(src):
+    # Remote URLs are fetched and cached by the browser; only local files
+    # are inlined as data URLs
+    url = src if is_remote(src) else img_data_url(src) or src
+    return (
+        f'<img src="{html.escape(url, quote=True)}" loading="lazy" '
+        'style="width:100%;border-radius:12px">'
+    )
+
+def animal_image(src, width):
+    # Remote URLs go straight to the browser, which fetches and caches them
+    if is_remote(src):
+        return src
+    return load_image_bytes(src, width) or src
 
 # --------------------------
 # Pages
@@ -191,12 +246,11 @@ def page_home(lang):
 
     # Quick category preview
     cols = st.columns(3)
-    items = list(ANIMAL_CATEGORIES.items())
-    for i, (cid, cinfo) in enumerate(items):
+    for i, (label, description, count) in enumerate(get_category_preview(lang)):
         with cols[i % 3]:
-            st.markdown(f"### {cinfo['icon']} {cinfo['name'][lang]}")
-            st.caption(cinfo["description"][lang])
-            st.caption(f"{len(get_animals_by_category(cid))} {tr('ency_animals', lang)}")
+            st.markdown(f"### {label}")
+            st.caption(description)
+            st.caption(f"{count} {tr('ency_animals', lang)}")
 
 def page_pet_identifier(lang):
     st.header(f"🐾 {tr('nav_pet', lang)}")
@@ -207,21 +261,25 @@ def page_pet_identifier(lang):
         type=["png", "jpg", "jpeg", "webp"],
     )
 
-    if not DASHSCOPE_API_KEY:
+    if not cfg().api_key:
         st.warning(tr("no_key_demo", lang))
 
     if uploaded:
+        raw = uploaded.getvalue()
         try:
-            img = Image.open(uploaded).convert("RGBA")
+            # Header-only check; no pixel decode or mode conversion needed here
+            img = Image.open(BytesIO(raw))
         except Exception:
             st.error("Invalid image file.")
             return
 
-        st.image(img, use_container_width=True)
+        st.image(raw, use_container_width=True)
 
         if st.button(tr("pet_result", lang)):
             with st.spinner("Analyzing..."):
-                result, err_flag = identify_pet_with_qwen(img, lang)
+                # Trust the decoded format over a possibly mislabelled extension
+                mime = PASSTHROUGH_MIME.get(img.format)
+                result, err_flag = identify_pet_with_qwen(raw, mime, lang, img)
 
             if err_flag == "NO_KEY":
                 st.info(tr("no_key_demo", lang))
@@ -234,16 +292,16 @@ def page_pet_identifier(lang):
                 )
             else:
                 st.subheader(tr("pet_result", lang))
-                st.markdown(result)
+                if isinstance(result, str):
+                    st.markdown(result)
+                else:
+                    st.write_stream(result)
 
 def page_encyclopedia(lang):
     st.header(f"📚 {tr('nav_ency', lang)}")
 
     # Category selector
-    cat_options = list(ANIMAL_CATEGORIES.keys())
-    cat_labels = [f"{ANIMAL_CATEGORIES[c]['icon']} {ANIMAL_CATEGORIES[c]['name'][lang]}" for c in cat_options]
-
-    label_to_id = {label: cid for label, cid in zip(cat_labels, cat_options)}
+    cat_labels, label_to_id = get_category_labels(lang)
 
     chosen_label = st.selectbox(tr("ency_pick_cat", lang), cat_labels)
     category_id = label_to_id[chosen_label]
@@ -252,19 +310,22 @@ def page_encyclopedia(lang):
     st.markdown(f"### {category_info['name'][lang]}")
     st.caption(category_info["description"][lang])
 
-    animals = get_animals_by_category(category_id)
+    _encyclopedia_body(lang, category_id)
+
+@st.fragment
+def _encyclopedia_body(lang, category_id):
+    # Detail buttons only rerun this grid + detail pane, not the whole app
+    ids, images, names, sci_names = get_category_columns(category_id, lang)
 
     # Simple grid cards
-    animal_ids = list(animals.keys())
     cols = st.columns(3)
 
     selected_id = None
-    for i, aid in enumerate(animal_ids):
-        a = animals[aid]
+    for i, (aid, image, name, sci_name) in enumerate(zip(ids, images, names, sci_names)):
         with cols[i % 3]:
-            st.image(a["image"], use_container_width=True)
-            st.markdown(f"**{a['name'][lang]}**")
-            st.caption(a["scientific_name"])
+            st.markdown(grid_image_html(image), unsafe_allow_html=True)
+            st.markdown(f"**{name}**")
+            st.caption(sci_name)
             if st.button(tr("detail", lang), key=f"detail_{aid}"):
                 selected_id = aid
 
@@ -273,7 +334,7 @@ def page_encyclopedia(lang):
         animal = get_animal_detail(selected_id)
         st.divider()
         st.subheader(animal["name"][lang])
-        st.image(animal["image"], width=520)
+        st.image(animal_image(animal["image"], 520), width=520)
         st.caption(animal["scientific_name"])
         st.write(animal["summary"][lang])
 
@@ -302,6 +363,14 @@ def page_about(lang):
         """
     )
 
+# Nav key -> page function
+PAGES = {
+    "nav_home": page_home,
+    "nav_pet": page_pet_identifier,
+    "nav_ency": page_encyclopedia,
+    "nav_about": page_about,
+}
+
 # --------------------------
 # Main
 # --------------------------
@@ -327,26 +396,15 @@ def main():
 
     lang = LANGS[lang_label]
 
-    # Navigation
+    # Navigation: translated label -> nav key (tr() is already memoized)
+    m = {tr(key, lang): key for key in PAGES}
     nav = st.sidebar.radio(
         "Navigation",
-        [
-            tr("nav_home", lang),
-            tr("nav_pet", lang),
-            tr("nav_ency", lang),
-            tr("nav_about", lang),
-        ],
+        list(m.keys()),
         label_visibility="collapsed",
     )
 
-    if nav == tr("nav_home", lang):
-        page_home(lang)
-    elif nav == tr("nav_pet", lang):
-        page_pet_identifier(lang)
-    elif nav == tr("nav_ency", lang):
-        page_encyclopedia(lang)
-    else:
-        page_about(lang)
+    PAGES[m[nav]](lang)
 
 if __name__ == "__main__":
     main()
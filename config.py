@@ -0,0 +1,23 @@
+# config.py
+
+import os
+from dataclasses import dataclass
+from functools import cache
+
+from dotenv import load_dotenv
+
+@dataclass(frozen=True, slots=True)
+class Cfg:
+    api_key: str
+    base_url: str
+    model: str
+
+@cache
+def cfg() -> Cfg:
+    # Imported module, so this runs once per process, not on every rerun
+    load_dotenv()
+    return Cfg(
+        api_key=os.getenv("DASHSCOPE_API_KEY", ""),
+        base_url=os.getenv("DASHSCOPE_BASE_URL", "https://dashscope.aliyuncs.com/compatible-mode/v1"),
+        model=os.getenv("QWEN_VL_MODEL", "qwen-vl-plus"),
+    )
@@ -0,0 +1,90 @@
+# i18n.py
+
+from functools import lru_cache
+
+LANGS = {
+    "English": "en",
+    "中文": "zh",
+    "한국어": "ko",
+}
+
+T = {
+    "app_title": {
+        "en": "Animal ID & Encyclopedia",
+        "zh": "动物识别与百科",
+        "ko": "동물 인식 & 백과",
+    },
+    "nav_home": {"en": "Home", "zh": "首页", "ko": "홈"},
+    "nav_pet": {"en": "Pet Identifier", "zh": "宠物识别", "ko": "반려동물 인식"},
+    "nav_ency": {"en": "Animal Encyclopedia", "zh": "动物百科", "ko": "동물 백과"},
+    "nav_about": {"en": "About", "zh": "关于", "ko": "소개"},
+
+    "home_intro": {
+        "en": "Upload a photo to identify pets and explore animals by category.",
+        "zh": "上传照片识别宠物，按分类探索动物百科。",
+        "ko": "사진을 업로드해 반려동물을 인식하고 분류별 동물을 탐색하세요.",
+    },
+    "pet_upload": {"en": "Upload a pet photo", "zh": "上传宠物照片", "ko": "반려동물 사진 업로드"},
+    "pet_result": {"en": "Identification Result", "zh": "识别结果", "ko": "인식 결과"},
+    "pet_tip": {
+        "en": "Tip: Clear face/body photos work best.",
+        "zh": "提示：宠物正脸或全身清晰照片效果最好。",
+        "ko": "팁: 얼굴/전신이 선명한 사진이 가장 좋아요.",
+    },
+    "no_key_demo": {
+        "en": "No API key found. Running in demo mode (no real AI call).",
+        "zh": "未检测到 API Key，已进入演示模式（不会真实调用AI）。",
+        "ko": "API 키가 없습니다. 데모 모드로 실행됩니다.",
+    },
+    "ency_pick_cat": {"en": "Choose a category", "zh": "选择分类", "ko": "분류 선택"},
+    "ency_animals": {"en": "Animals", "zh": "动物列表", "ko": "동물 목록"},
+    "detail": {"en": "Details", "zh": "详情", "ko": "상세"},
+    "habitat": {"en": "Habitat", "zh": "栖息地", "ko": "서식지"},
+    "facts": {"en": "Fun facts", "zh": "趣味事实", "ko": "재미있는 사실"},
+    "about_text": {
+        "en": "A lightweight Streamlit app for pet identification and animal knowledge.",
+        "zh": "一个轻量级的 Streamlit 宠物识别与动物科普网站。",
+        "ko": "반려동물 인식과 동물 지식을 위한 가벼운 Streamlit 앱입니다.",
+    },
+}
+
+# Prompt per UI language; the model is asked to respond in that language.
+PROMPTS = {
+    "en": """You are a pet expert. Identify the pet in the photo.
+Return:
+1) Species/Breed (if confident)
+2) Key visual cues
+3) Likely age stage (baby/adult/senior)
+4) Care tips (3-5 bullets)
+5) Safety note if uncertain
+
+If not a pet, say what the main subject is.""",
+    "zh": """你是宠物专家。请识别照片中的宠物。
+按以下结构输出：
+1）物种/品种（有把握再写）
+2）关键视觉依据
+3）可能年龄阶段（幼年/成年/老年）
+4）饲养与护理建议（3-5条）
+5）不确定性与安全提示
+
+如果不是宠物，请说明主要内容。""",
+    "ko": """당신은 반려동물 전문가입니다. 사진 속 반려동물을 식별하세요.
+다음 구조로 답변:
+1) 종/품종(확신할 때만)
+2) 핵심 시각적 근거
+3) 추정 연령 단계(유/성/노)
+4) 사육·관리 팁(3-5개)
+5) 불확실성 및 안전 안내
+
+반려동물이 아니면 주요 피사체를 설명하세요.""",
+}
+
+# Flat (key, lang) -> text table so a lookup is a single dict hit,
+# plus the English fallback per key. Built once at import: Streamlit re-execs
+# app.py on every rerun, but imported modules stay loaded.
+T_FLAT = {(k, l): v for k, d in T.items() for l, v in d.items()}
+T_EN = {k: d.get("en", k) for k, d in T.items()}
+
+@lru_cache(maxsize=1024)
+def tr(key, lang):
+    return T_FLAT.get((key, lang)) or T_EN.get(key, key)